@@ -3,7 +3,13 @@ import logging
 import os
 from email.header import decode_header
 from typing import Optional
-import requests as py_requests
+
+from client.logging_config import setup_logging
+
+# Configure logging before the imports below, which log while they load
+setup_logging()
+
+import httpx
 from dotenv import load_dotenv
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -16,7 +22,6 @@ from client.persistence.models.user import User
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 logger.info("Starting Google authentication...")
@@ -35,14 +40,10 @@ if not creds_file_path or not token_path:
 
 
 def decode_mime_header(header: str) -> str:
-    decoded_parts = decode_header(header)
-    decoded_string = ""
-    for part, encoding in decoded_parts:
-        if isinstance(part, bytes):
-            decoded_string += part.decode(encoding or "utf-8")
-        else:
-            decoded_string += part
-    return decoded_string
+    return "".join(
+        part.decode(encoding or "utf-8") if isinstance(part, bytes) else part
+        for part, encoding in decode_header(header)
+    )
 
 
 SCOPES = [
@@ -55,6 +56,9 @@ SCOPES = [
 
 _google_service_instance: Optional["GoogleServices"] = None
 
+# Parsed token files keyed by (path, scopes); the mtime detects rewrites
+_TOKEN_CACHE: dict[tuple[str, tuple[str, ...]], tuple[float, Credentials]] = {}
+
 class GoogleServices:
     def __init__(
         self,
@@ -62,7 +66,7 @@ class GoogleServices:
         token_path: str,
         scopes: list[str] = SCOPES
     ):
-        logger.info(f"Initializing GoogleServices with creds file: {creds_file_path}")
+        logger.info("Initializing GoogleServices with creds file: %s", creds_file_path)
         self.creds_file_path = creds_file_path
         self.token_path = token_path
         self.scopes = scopes
@@ -75,8 +79,15 @@ class GoogleServices:
         creds = None
 
         if os.path.exists(self.token_path):
-            logger.info(f"Loading token from file: {self.token_path}")
-            creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+            cache_key = (self.token_path, tuple(self.scopes))
+            mtime = os.stat(self.token_path).st_mtime
+            cached = _TOKEN_CACHE.get(cache_key)
+            if cached is not None and cached[0] == mtime:
+                creds = cached[1]
+            else:
+                logger.info("Loading token from file: %s", self.token_path)
+                creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+                _TOKEN_CACHE[cache_key] = (mtime, creds)
 
         if creds and creds.expired and creds.refresh_token:
             try:
@@ -84,7 +95,7 @@ class GoogleServices:
                 creds.refresh(Request())
                 return creds
             except Exception as e:
-                logger.warning(f"Token refresh failed: {e}")
+                logger.warning("Token refresh failed: %s", e)
                 creds = None
 
         if not creds or not creds.valid:
@@ -97,17 +108,22 @@ class GoogleServices:
 
             with open(self.token_path, "w") as token_file:
                 token_file.write(creds.to_json())
-                logger.info(f"Token saved to: {self.token_path}")
+                logger.info("Token saved to: %s", self.token_path)
+            _TOKEN_CACHE[(self.token_path, tuple(self.scopes))] = (
+                os.stat(self.token_path).st_mtime,
+                creds,
+            )
 
         return creds
 
     async def authenticate_and_store_user(self):
         logger.info("Fetching user profile from Google UserInfo endpoint...")
 
-        response = py_requests.get(
-            "https://www.googleapis.com/oauth2/v3/userinfo",
-            headers={"Authorization": f"Bearer {self.token.token}"}
-        )
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(
+                "https://www.googleapis.com/oauth2/v3/userinfo",
+                headers={"Authorization": f"Bearer {self.token.token}"}
+            )
 
         if response.status_code != 200:
             raise RuntimeError("Failed to fetch user info")
@@ -116,7 +132,7 @@ class GoogleServices:
         self.user_id = profile["sub"]
         self.user_email = profile["email"]
 
-        logger.info(f"Authenticated Google user: {self.user_email} ({self.user_id})")
+        logger.info("Authenticated Google user: %s (%s)", self.user_email, self.user_id)
         await User.save_if_not_exists(user_id=self.user_id, email=self.user_email)
         return self.user_id
 
@@ -124,7 +140,7 @@ class GoogleServices:
         try:
             return build("gmail", "v1", credentials=self.token)
         except HttpError as error:
-            logger.error(f"An error occurred building Gmail service: {error}")
+            logger.error("An error occurred building Gmail service: %s", error)
             raise
 
 def get_google_service_instance() -> GoogleServices:
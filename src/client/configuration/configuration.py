@@ -1,9 +1,18 @@
 import os
-import json
+import copy
+from functools import lru_cache
+import orjson
 from dotenv import load_dotenv
 from typing import Any
 
 
+@lru_cache(maxsize=8)
+def _read_config(path: str, mtime: float) -> dict[str, Any]:
+    """Parse a config file; the mtime in the key invalidates stale entries."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
 class Configuration:
     """Manages configuration and environment variables for the MCP client."""
 
@@ -13,6 +22,8 @@ class Configuration:
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.llm_model = os.getenv("LLM_MODEL")
         self.project = os.getenv("PROJECT")
+        # Max graph super-steps per turn, including plan/join replan loops
+        self.recursion_limit = int(os.getenv("RECURSION_LIMIT") or 100)
         self.mcp_config_path = mcp_config_path
 
     @staticmethod
@@ -23,6 +34,9 @@ class Configuration:
     def load_config(self) -> dict[str, Any]:
         """Load server configuration from JSON file.
 
+        The file is parsed once per modification time and shared across
+        Configuration instances; each call gets its own copy.
+
         Args:
             file_path: Path to the JSON configuration file.
 
@@ -33,8 +47,8 @@ class Configuration:
             FileNotFoundError: If configuration file doesn't exist.
             JSONDecodeError: If configuration file is invalid JSON.
         """
-        with open(self.mcp_config_path, "r") as f:
-            return json.load(f)
+        path = self.mcp_config_path
+        return copy.deepcopy(_read_config(path, os.path.getmtime(path)))
 
     @property
     def llm_api_key(self) -> str:
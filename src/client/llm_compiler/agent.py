@@ -2,18 +2,23 @@ import asyncio
 import getpass
 import os
 import logging
+import uuid
+
+from client.logging_config import setup_logging
+
+# Configure logging before the imports below, which log while they load
+setup_logging()
 
 from dotenv import load_dotenv
-from langchain_core.messages import AIMessage
 from langgraph.graph import END, StateGraph, START
-from langchain_core.messages import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.store.memory import InMemoryStore
+from langchain_core.messages import HumanMessage, messages_from_dict, messages_to_dict
 
 from client.llm_compiler.planner import Planner
+from client.llm_compiler.checkpoint import BufferedSaver
+from client.llm_compiler.store import SHARED_STORE, NamespacedStore
 from client.configuration.configuration import Configuration
 from client.llm_compiler.joiner import Joiner
+from client.llm_compiler.llm import get_chat_llm
 from client.llm_compiler.classifier_graph import QueryClassificationGraph
 from client.llm_compiler.state import State
 from client.llm_compiler.plan_and_execute_graph import PlanAndExecuteGraph
@@ -21,11 +26,6 @@ from client.llm_compiler.postprocess_graph import PostprocessingGraph
 from client.persistence.models.thread import UserThread
 
 
-
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 load_dotenv()
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 if LANGSMITH_API_KEY is None:
@@ -34,29 +34,52 @@ if LANGSMITH_API_KEY is None:
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
+_CLASSIFICATION_ROUTES = {True: END, False: "planning"}
+
+
 class LangGraphWorkflow:
+    # Compiled subgraphs that only depend on the shared chat model, keyed by
+    # (name, model, api_key) and reused across sessions
+    _subgraph_cache: dict = {}
+
     def __init__(self, config: Configuration, user_id: str = None, thread_id: str = None):
         self.user_id = user_id
         self.thread_id = thread_id
         self.config = config
         self.task_scheduler = None
-        self.joiner = Joiner(config)
         self.graph_builder = None
+        self.graph = None
         self.planner = None
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.config.llm_model,
-            google_api_key=self.config.api_key,
-        )
-        self.checkpointer = InMemorySaver()
-        self.store = InMemoryStore()
+        self.llm = get_chat_llm(self.config.llm_model, self.config.api_key)
+        self.joiner = Joiner(config, self.llm)
+        self.checkpointer = BufferedSaver()
+        self.store = NamespacedStore(SHARED_STORE, (user_id or "anonymous", thread_id))
+        self._restored_messages = None
+        # Serialized messages already saved to UserThread (None: rewrite them all)
+        self._persisted = []
+
+    def _thread_config(self):
+        return {"configurable": {"thread_id": self.thread_id}}
 
     async def persist_session(self):
-        await UserThread.save_or_update(
+        """Flush the turn's buffered checkpoints and save the thread's messages."""
+        self.checkpointer.flush()
+        if self.user_id is None:
+            return
+        snapshot = await self.graph.aget_state(self._thread_config())
+        self._persisted = await UserThread.save_messages(
             user_id=self.user_id,
             thread_id=self.thread_id,
-            store=self.store.to_json(),
-            checkpoint=self.checkpointer.to_json()
+            messages=messages_to_dict(snapshot.values.get("messages", [])),
+            persisted=self._persisted,
         )
+
+    async def close(self):
+        """Release the session's MCP client and drop its items from the shared store."""
+        if self.planner:
+            await self.planner.release()
+        self.store.close()
+
     async def __initialization__(self):
         logging.info("Initializing planner...")
         self.planner = Planner(self.llm, self.config)
@@ -70,8 +93,10 @@ class LangGraphWorkflow:
             raise ValueError(f"No session found for user {user_id} and thread {thread_id}")
 
         graph = cls(config, user_id, thread_id)
-        graph.store.load_json(session_row.store)
-        graph.checkpointer.load_json(session_row.checkpoint)
+        stored = session_row.messages()
+        graph._restored_messages = messages_from_dict(stored)
+        # Old snapshot rows are rewritten as a message list on the next save
+        graph._persisted = None if session_row.is_snapshot else stored
         await graph.__initialization__()
         return graph
 
@@ -90,13 +115,25 @@ class LangGraphWorkflow:
         postprocessing = PostprocessingGraph(self.llm)
         return postprocessing.build_subgraph()
 
-    
+    async def _cached_subgraph(self, name, build):
+        key = (name, self.config.llm_model, self.config.api_key)
+        if key not in self._subgraph_cache:
+            self._subgraph_cache[key] = await build()
+        return self._subgraph_cache[key]
+
     async def build_graph(self):
+        if self.graph is not None:
+            return self.graph
         logging.info("Building LangGraph graph...")
-        
-        classifier_subgraph = await self.build_classifier_subgraph()
+
+        classifier_subgraph = await self._cached_subgraph(
+            "classifier", self.build_classifier_subgraph
+        )
+        # Closes over this session's planner (and its MCP client), so never shared
         plan_and_execute_subgraph = await self.build_plan_and_execute_subgraph()
-        postprocessing_subgraph = await self.build_postprocessing_subgraph()
+        postprocessing_subgraph = await self._cached_subgraph(
+            "postprocess", self.build_postprocessing_subgraph
+        )
         self.graph_builder = StateGraph(State)
 
         self.graph_builder.add_node("simple_or_complex", classifier_subgraph)
@@ -105,38 +142,55 @@ class LangGraphWorkflow:
         self.graph_builder.add_edge(START, "simple_or_complex")
 
 
+        # The classifier already answered simple queries; only complex ones plan
         self.graph_builder.add_conditional_edges(
             "simple_or_complex",
-            lambda state: END if isinstance(state["messages"][-1], AIMessage) else "planning"
+            lambda state: _CLASSIFICATION_ROUTES[state.get("classification") == "simple"],
+            ["planning", END],
         )
-        self.graph_builder.add_conditional_edges("planning", lambda state: "postprocess")
+        self.graph_builder.add_edge("planning", "postprocess")
         self.graph_builder.add_edge("postprocess", END)
 
-        return self.graph_builder.compile(checkpointer=self.checkpointer, store=self.store)
+        self.graph = self.graph_builder.compile(checkpointer=self.checkpointer, store=self.store)
+        if self._restored_messages:
+            # Seed the thread as if the previous turn had just finished, so the
+            # next input starts from START
+            await self.graph.aupdate_state(
+                self._thread_config(),
+                {"messages": self._restored_messages},
+                as_node="postprocess",
+            )
+            self._restored_messages = None
+        return self.graph
 
     
 async def main():
     mcp_config_path = "src/client/configuration/servers_config.json"
     config = Configuration(mcp_config_path)
-    workflow = LangGraphWorkflow(config)
+    thread_id = str(uuid.uuid4())
+    workflow = LangGraphWorkflow(config, thread_id=thread_id)
+    await workflow.__initialization__()
+    # Compiled once and reused for every turn; the checkpointer keys each
+    # turn's state by thread_id.
     graph = await workflow.build_graph()
+    run_config = {"recursion_limit": config.recursion_limit, "configurable": {"thread_id": thread_id}}
 
     try:
         while True:
-            user_input = input("You: ").strip()
+            # Read stdin on a worker thread so the event loop stays live
+            user_input = (await asyncio.to_thread(input, "You: ")).strip()
             if user_input.lower() in ["exit", "quit"]:
                 break
 
             state = {"messages": [HumanMessage(content=user_input)]}
-            result = await graph.ainvoke(state)
+            result = await graph.ainvoke(state, run_config)
+            await workflow.persist_session()
             print("Result:", result)
 
 
     finally:
-        if workflow.planner and workflow.planner.client:
-            await workflow.planner.client.__aexit__(None, None, None)
+        await workflow.close()
 
 if __name__ == "__main__":
-    import logging
     logging.info("Starting LangGraph workflow...")
     asyncio.run(main())
@@ -0,0 +1,107 @@
+from typing import Any, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class BufferedSaver(InMemorySaver):
+    """InMemorySaver that defers checkpoint writes until they are read or flushed.
+
+    LangGraph checkpoints after every super-step, but resuming a thread only
+    needs the latest checkpoint of each namespace. Intermediate checkpoints of
+    a run are coalesced in memory and serialized once, when the namespace is
+    next read or on flush().
+    """
+
+    def __init__(self):
+        super().__init__()
+        # (thread_id, checkpoint_ns) -> [parent config, checkpoint, metadata, changed channels]
+        self._pending: dict[tuple[str, str], list] = {}
+        # (thread_id, checkpoint_ns, checkpoint_id) -> [(writes, task_id, task_path)]
+        self._pending_writes: dict[tuple[str, str, str], list] = {}
+        # Ids of buffered checkpoints that a later one in the same namespace replaced
+        self._superseded: set[str] = set()
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        key = (thread_id, checkpoint_ns)
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = [config, checkpoint, metadata, set(new_versions)]
+        else:
+            self._superseded.add(entry[1]["id"])
+            entry[1], entry[2] = checkpoint, metadata
+            entry[3].update(new_versions)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = (
+            config["configurable"]["thread_id"],
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        self._pending_writes.setdefault(key, []).append((list(writes), task_id, task_path))
+
+    def get_tuple(self, config: RunnableConfig):
+        self._flush(
+            config["configurable"]["thread_id"],
+            config["configurable"].get("checkpoint_ns", ""),
+        )
+        return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs):
+        if config is None:
+            self.flush()
+        else:
+            self._flush(config["configurable"]["thread_id"])
+        return super().list(config, **kwargs)
+
+    def flush(self) -> None:
+        """Write every buffered checkpoint and pending write to the inner saver."""
+        self._flush()
+
+    def _flush(self, thread_id: Optional[str] = None, checkpoint_ns: Optional[str] = None) -> None:
+        def selected(key):
+            return (thread_id is None or key[0] == thread_id) and (
+                checkpoint_ns is None or key[1] == checkpoint_ns
+            )
+
+        for key in [key for key in self._pending if selected(key)]:
+            config, checkpoint, metadata, channels = self._pending.pop(key)
+            versions = checkpoint["channel_versions"]
+            super().put(
+                config,
+                checkpoint,
+                metadata,
+                {channel: versions[channel] for channel in channels if channel in versions},
+            )
+
+        for key in [key for key in self._pending_writes if selected(key)]:
+            pending = self._pending_writes.pop(key)
+            if key[2] in self._superseded:
+                continue
+            config = {
+                "configurable": {
+                    "thread_id": key[0],
+                    "checkpoint_ns": key[1],
+                    "checkpoint_id": key[2],
+                }
+            }
+            for writes, task_id, task_path in pending:
+                super().put_writes(config, writes, task_id, task_path)
+
+        if thread_id is None:
+            self._superseded.clear()
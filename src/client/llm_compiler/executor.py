@@ -1,22 +1,21 @@
-import logging
-import re
-import time
-from concurrent.futures import ThreadPoolExecutor, wait
-from typing import Any, Dict, Iterable, List, Union
-from typing_extensions import TypedDict
+import asyncio
+from typing import Any, AsyncIterable, Dict, Iterable, List, Union
+from typing_extensions import NotRequired, TypedDict
 from langchain_core.runnables import chain as as_runnable
 from langchain_core.messages import (
     BaseMessage,
     FunctionMessage
 )
-from client.llm_compiler.output_parser import  Task
+from client.llm_compiler.output_parser import ID_PATTERN, Task
+
+# Upper bound on tool calls in flight for a single plan
+MAX_CONCURRENT_TASKS = 8
+
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 class SchedulerInput(TypedDict):
     messages: List[BaseMessage]
-    tasks: Iterable[Task]
+    tasks: Union[Iterable[Task], AsyncIterable[Task]]
+    max_concurrency: NotRequired[int]
 
 
 def _get_observations(messages: List[BaseMessage]) -> Dict[int, Any]:
@@ -57,9 +56,6 @@ async def _execute_task(task, observations, config):
 
 
 def _resolve_arg(arg: Union[str, Any], observations: Dict[int, Any]):
-    # $1 or ${1} -> 1
-    ID_PATTERN = r"\$\{?(\d+)\}?"
-
     def replace_match(match):
         # If the string is ${123}, match.group(0) is ${123}, and match.group(1) is 123.
 
@@ -70,7 +66,7 @@ def _resolve_arg(arg: Union[str, Any], observations: Dict[int, Any]):
 
     # For dependencies on other tasks
     if isinstance(arg, str):
-        return re.sub(ID_PATTERN, replace_match, arg)
+        return ID_PATTERN.sub(replace_match, arg)
     elif isinstance(arg, list):
         return [_resolve_arg(a, observations) for a in arg]
     else:
@@ -92,16 +88,20 @@ async def schedule_task(task_inputs, config):
     observations[task["idx"]] = observation
 
 
-def schedule_pending_task(
-    task: Task, observations: Dict[int, Any], retry_after: float = 0.2
+async def schedule_pending_task(
+    task: Task,
+    observations: Dict[int, Any],
+    semaphore: asyncio.Semaphore,
+    retry_after: float = 0.2,
 ):
     while True:
         deps = task["dependencies"]
         if deps and (any([dep not in observations for dep in deps])):
             # Dependencies not yet satisfied
-            time.sleep(retry_after)
+            await asyncio.sleep(retry_after)
             continue
-        schedule_task.invoke({"task": task, "observations": observations})
+        async with semaphore:
+            await schedule_task.ainvoke({"task": task, "observations": observations})
         break
 
 
@@ -124,33 +124,46 @@ async def schedule_tasks(scheduler_input: SchedulerInput) -> List[FunctionMessag
     originals = set(observations)
     # ^^ We assume each task inserts a different key above to
     # avoid race conditions...
-    futures = []
+    pending = []
     retry_after = 0.25  # Retry every quarter second
-    with ThreadPoolExecutor() as executor:
-        for task in tasks:
-            deps = task["dependencies"]
-            task_names[task["idx"]] = (
-                task["tool"] if isinstance(task["tool"], str) else task["tool"].name
+    # Caps simultaneous MCP calls when the planner emits a very wide plan
+    semaphore = asyncio.Semaphore(
+        scheduler_input.get("max_concurrency", MAX_CONCURRENT_TASKS)
+    )
+
+    def submit(task: Task):
+        task_names[task["idx"]] = (
+            task["tool"] if isinstance(task["tool"], str) else task["tool"].name
+        )
+        args_for_tasks[task["idx"]] = task["args"]
+        # Every task runs as its own asyncio task: ones whose deps are already
+        # satisfied start immediately and run alongside their siblings, the
+        # rest wait for their deps to land in `observations`.
+        pending.append(
+            asyncio.create_task(
+                schedule_pending_task(task, observations, semaphore, retry_after)
             )
-            args_for_tasks[task["idx"]] = task["args"]
-            if (
-                # Depends on other tasks
-                deps and (any([dep not in observations for dep in deps]))
-            ):
-                futures.append(
-                    executor.submit(
-                        schedule_pending_task, task, observations, retry_after
-                    )
-                )
-            else:
-                # No deps or all deps satisfied
-                # can schedule now
-                await schedule_task.ainvoke(dict(task=task, observations=observations))
-                # futures.append(executor.submit(schedule_task.invoke, dict(task=task, observations=observations)))
-
-        # All tasks have been submitted or enqueued
-        # Wait for them to complete
-        wait(futures)
+        )
+
+    try:
+        if isinstance(tasks, AsyncIterable):
+            # Streamed plan: dispatch each task while the planner is still decoding
+            async for task in tasks:
+                submit(task)
+        else:
+            for task in tasks:
+                submit(task)
+    except BaseException:
+        # The plan broke off midway; don't leave already dispatched tool calls
+        # running unobserved
+        for pending_task in pending:
+            pending_task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+
+    # All tasks have been submitted or enqueued
+    # Wait for them to complete
+    await asyncio.gather(*pending)
     # Convert observations to new tool messages to add to the state
     new_observations = {
         k: (task_names[k], args_for_tasks[k], observations[k])
@@ -1,24 +1,19 @@
-import logging
-from typing import List, Union
+from typing import Union
 import getpass
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from langchain import hub
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import AIMessage
 from langchain_core.messages import (
-    BaseMessage,
     HumanMessage,
     SystemMessage,
 )
 from client.configuration.configuration import Configuration
+from client.llm_compiler.llm import get_chat_llm
+from client.llm_compiler.prompts import pull_prompt
 
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 load_dotenv()  # Load environment variables from .env file
 
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
@@ -28,6 +23,8 @@ if LANGSMITH_API_KEY is None:
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
+joiner_prompt = pull_prompt("wfh/llm-compiler-joiner").partial(examples="")
+
 class FinalResponse(BaseModel):
     """The final response/answer."""
 
@@ -48,42 +45,45 @@ class JoinOutputs(BaseModel):
     )
     action: Union[FinalResponse, Replan]
     
-def _parse_joiner_output(decision: JoinOutputs) -> List[BaseMessage]:
-    response = [AIMessage(content=f"Thought: {decision.thought}")]
-    if isinstance(decision.action, Replan):
-        return {
-            "messages": response
-            + [
-                SystemMessage(
-                    content=f"Context from last attempt: {decision.action.feedback}"
-                )
-            ]
-        }
-    else:
-        return {"messages": response + [AIMessage(content=decision.action.response)]}
+def _as_replan(decision: JoinOutputs, thought: AIMessage) -> dict:
+    return {
+        "messages": [
+            thought,
+            SystemMessage(content=f"Context from last attempt: {decision.action.feedback}"),
+        ]
+    }
+
+
+def _as_final(decision: JoinOutputs, thought: AIMessage) -> dict:
+    return {"messages": [thought, AIMessage(content=decision.action.response)]}
+
+
+_JOINER_OUTPUT_BUILDERS = {Replan: _as_replan, FinalResponse: _as_final}
+
+
+def _parse_joiner_output(decision: JoinOutputs) -> dict:
+    thought = AIMessage(content=f"Thought: {decision.thought}")
+    return _JOINER_OUTPUT_BUILDERS[type(decision.action)](decision, thought)
 
 
 def select_recent_messages(state) -> dict:
     messages = state["messages"]
-    selected = []
-    for msg in messages[::-1]:
-        selected.append(msg)
-        if isinstance(msg, HumanMessage):
-            break
-    return {"messages": selected[::-1]}
+    # Everything from the last human message on (or all of it if there is none)
+    start = next(
+        (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+        0,
+    )
+    return {"messages": messages[start:]}
 
 
 
 
 class Joiner():
-    def __init__(self, config: Configuration) -> None:
+    def __init__(self, config: Configuration, llm: ChatGoogleGenerativeAI = None) -> None:
         self.config = config
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.config.llm_model,
-            google_api_key=self.config.api_key,
-        )
-        self.prompt = hub.pull("wfh/llm-compiler-joiner").partial(
-    examples="")
+        # Reuse the caller's chat model (and its connection) when given one
+        self.llm = llm or get_chat_llm(self.config.llm_model, self.config.api_key)
+        self.prompt = joiner_prompt
         self.joiner = None
     def create_joiner(self):
         runnable = self.prompt | self.llm.with_structured_output(
@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+
+@lru_cache(maxsize=8)
+def get_chat_llm(model: str, api_key: str) -> ChatGoogleGenerativeAI:
+    """Return a process-wide chat model for (model, api_key).
+
+    Sharing one instance lets every workflow reuse the same underlying
+    Gemini client and its connections instead of opening new ones.
+    """
+    return ChatGoogleGenerativeAI(model=model, google_api_key=api_key)
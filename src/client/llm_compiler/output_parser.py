@@ -1,13 +1,16 @@
 import ast
+import json
 import logging
 import re
+from functools import cached_property
 from typing import (
     Any,
+    AsyncIterator,
     Dict,
     Iterator,
     List,
+    Mapping,
     Optional,
-    Sequence,
     Tuple,
     Union,
 )
@@ -19,23 +22,30 @@ from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
 from typing_extensions import TypedDict
 
-THOUGHT_PATTERN = r"Thought: ([^\n]*)"
-ACTION_PATTERN = r"\n*(\d+)\. (\w+)\((.*)\)(\s*#\w+\n)?"
+THOUGHT_PATTERN = re.compile(r"Thought: ([^\n]*)")
+ACTION_PATTERN = re.compile(r"\n*(\d+)\. (\w+)\((.*)\)(\s*#\w+\n)?")
 # $1 or ${1} -> 1
-ID_PATTERN = r"\$\{?(\d+)\}?"
+ID_PATTERN = re.compile(r"\$\{?(\d+)\}?")
 END_OF_PLAN = "<END_OF_PLAN>"
 
 
 ### Helper functions
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"Unsupported JSON constant: {name}")
+
 
 def _ast_parse(arg: str) -> Any:
     try:
         return ast.literal_eval(arg)
     except:  # noqa
+        pass
+    # Lenient fallback: the LLM sometimes writes JSON literals (true/false/null)
+    # which literal_eval rejects; recovering here avoids a replan round-trip.
+    try:
+        return json.loads(arg, parse_constant=_reject_constant)
+    except ValueError:
         return arg
 
 
@@ -49,16 +59,18 @@ def _parse_llm_compiler_action_args(args: str, tool: Union[str, BaseTool]) -> li
     tool_key = None
     prev_idx = None
     for key in tool.args.keys():
-        # Split if present
-        if f"{key}=" in args:
-            idx = args.index(f"{key}=")
-            if prev_idx is not None:
-                extracted_args[tool_key] = _ast_parse(
-                    args[prev_idx:idx].strip().rstrip(",")
-                )
-            args = args.split(f"{key}=", 1)[1]
-            tool_key = key
-            prev_idx = 0
+        # Split if present; a single find replaces the in/index/split triple scan
+        marker = f"{key}="
+        idx = args.find(marker)
+        if idx == -1:
+            continue
+        if prev_idx is not None:
+            extracted_args[tool_key] = _ast_parse(
+                args[prev_idx:idx].strip().rstrip(",")
+            )
+        args = args[idx + len(marker):]
+        tool_key = key
+        prev_idx = 0
     if prev_idx is not None:
         extracted_args[tool_key] = _ast_parse(
             args[prev_idx:].strip().rstrip(",").rstrip(")")
@@ -66,19 +78,15 @@ def _parse_llm_compiler_action_args(args: str, tool: Union[str, BaseTool]) -> li
     return extracted_args
 
 
-def default_dependency_rule(idx, args: str):
-    matches = re.findall(ID_PATTERN, args)
-    numbers = [int(match) for match in matches]
-    return idx in numbers
-
-
 def _get_dependencies_from_graph(
     idx: int, tool_name: str, args: Dict[str, Any]
 ) -> dict[str, list[str]]:
     """Get dependencies from a graph."""
     if tool_name == "join":
         return list(range(1, idx))
-    return [i for i in range(1, idx) if default_dependency_rule(i, str(args))]
+    # Scan the args once instead of re-running the regex for every prior index
+    referenced = {int(match) for match in ID_PATTERN.findall(str(args))}
+    return [i for i in range(1, idx) if i in referenced]
 
 
 class Task(TypedDict):
@@ -90,19 +98,19 @@ class Task(TypedDict):
 
 
 def instantiate_task(
-    tools: Sequence[BaseTool],
+    tools: Mapping[str, BaseTool],
     idx: int,
     tool_name: str,
     args: Union[str, Any],
     thought: Optional[str] = None,
 ) -> Task:
-    logging.debug(f"Tool name: {tools}")
+    logging.debug("Tool name: %s", tools)
     if tool_name == "join":
         tool = "join"
     else:
         try:
-            tool = tools[[tool.name for tool in tools].index(tool_name)]
-        except ValueError as e:
+            tool = tools[tool_name]
+        except KeyError as e:
             raise OutputParserException(f"Tool {tool_name} not found.") from e
     tool_args = _parse_llm_compiler_action_args(args, tool)
     dependencies = _get_dependencies_from_graph(idx, tool_name, tool_args)
@@ -121,6 +129,11 @@ class LLMCompilerPlanParser(BaseTransformOutputParser[dict], extra="allow"):
 
     tools: List[BaseTool]
 
+    @cached_property
+    def tools_by_name(self) -> Dict[str, BaseTool]:
+        """Name -> tool index, built once so each parsed action is an O(1) lookup."""
+        return {tool.name: tool for tool in self.tools}
+
     def _transform(self, input: Iterator[Union[str, BaseMessage]]) -> Iterator[Task]:
         texts = []
         # TODO: Cleanup tuple state tracking here.
@@ -136,6 +149,23 @@ class LLMCompilerPlanParser(BaseTransformOutputParser[dict], extra="allow"):
             if task:
                 yield task
 
+    async def _atransform(
+        self, input: AsyncIterator[Union[str, BaseMessage]]
+    ) -> AsyncIterator[Task]:
+        # Same line-buffered parse as _transform, so each task is yielded as
+        # soon as its line is complete while the planner is still decoding
+        texts = []
+        thought = None
+        async for chunk in input:
+            text = chunk if isinstance(chunk, str) else str(chunk.content)
+            for task, _thought in self.ingest_token(text, texts, thought):
+                yield task
+        # Final possible task
+        if texts:
+            task, _ = self._parse_task("".join(texts), thought)
+            if task:
+                yield task
+
     def parse(self, text: str) -> List[Task]:
         return list(self._transform([text]))
 
@@ -163,16 +193,19 @@ class LLMCompilerPlanParser(BaseTransformOutputParser[dict], extra="allow"):
 
     def _parse_task(self, line: str, thought: Optional[str] = None):
         task = None
-        if match := re.match(THOUGHT_PATTERN, line):
+        # Cheap prefix checks first so prose lines never reach the regexes
+        if line.startswith("Thought: "):
             # Optionally, action can be preceded by a thought
-            thought = match.group(1)
-        elif match := re.match(ACTION_PATTERN, line):
+            thought = THOUGHT_PATTERN.match(line).group(1)
+        elif line.lstrip("\n")[:1].isdigit() and (
+            match := ACTION_PATTERN.match(line)
+        ):
             # if action is parsed, return the task, and clear the buffer
             idx, tool_name, args, _ = match.groups()
             idx = int(idx)
-            logging.debug(f"tools: {self.tools}")
+            logging.debug("tools: %s", self.tools)
             task = instantiate_task(
-                tools=self.tools,
+                tools=self.tools_by_name,
                 idx=idx,
                 tool_name=tool_name,
                 args=args,
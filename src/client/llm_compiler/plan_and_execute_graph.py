@@ -1,4 +1,3 @@
-import itertools
 import os
 import getpass
 import logging
@@ -8,15 +7,13 @@ from langchain_core.runnables import chain as as_runnable
 from langchain_core.messages import AIMessage
 from langgraph.graph import START, END, StateGraph
 
-from client.llm_compiler.planner import Planner
+from client.llm_compiler.planner import Planner, should_replan
+from client.llm_compiler.plan_cache import PLAN_CACHE, PendingPlan
 from client.llm_compiler.executor import schedule_tasks
 from client.llm_compiler.joiner import Joiner
 from client.llm_compiler.state import State
 
 
-
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
 load_dotenv()
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 if LANGSMITH_API_KEY is None:
@@ -25,12 +22,20 @@ if LANGSMITH_API_KEY is None:
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
+async def _record(tasks, sink: list):
+    """Pass streamed tasks through while keeping a copy of each."""
+    async for task in tasks:
+        sink.append(task)
+        yield task
+
+
 class PlanAndExecuteGraph:
     def __init__(self, llm, joiner: Joiner, planner: Planner):
         self.llm = llm
         self.joiner = joiner
         self.planner = planner
         self.task_scheduler = None
+        self._pending_plan = PendingPlan(PLAN_CACHE)
 
     async def build_planning_subgraph(self):
         logging.info("Building planning subgraph...")
@@ -39,29 +44,35 @@ class PlanAndExecuteGraph:
         async def plan_and_schedule(state):
             logging.info("Planning and scheduling...")
             messages = state["messages"]
-            tools = await self.planner.model.ainvoke(messages)
-            tasks = iter(tools)
-            # Begin executing the planner immediately
-            try:
-                tasks = itertools.chain([next(tasks)], tasks)
-            except StopIteration:
-                # Handle the case where tasks is empty.
-                tasks = iter([])
+            # Replans build on the previous attempt's results, so only fresh
+            # plans are looked up and stored
+            cache_key = None
+            tasks = None
+            if not should_replan(messages):
+                cache_key = PLAN_CACHE.key(self.planner.tool_descriptions, messages)
+                tasks = PLAN_CACHE.get(cache_key, self.planner.tools_by_name)
+            planned = []
+            if tasks is not None:
+                logging.info("Reusing cached plan")
+                cache_key = None
+            else:
+                # Stream the plan so tasks are scheduled as soon as they are parsed
+                tasks = _record(self.planner.model.astream(messages), planned)
             scheduled_tasks = await schedule_tasks.ainvoke(
                 {
                     "messages": messages,
                     "tasks": tasks,
                 }
             )
-            logging.info(f"Scheduled tasks: {scheduled_tasks}")
+            self._pending_plan.hold(cache_key, planned, scheduled_tasks)
+            logging.debug("Scheduled tasks: %s", scheduled_tasks)
             return {"messages": scheduled_tasks}
 
 
         def should_continue(state):
             logging.info("Checking if we should continue...")
-            messages = state["messages"]
-            logging.info(f"Messages: {messages}")
-            if isinstance(messages[-1], AIMessage):
+            logging.debug("Messages: %s", state["messages"])
+            if state.get("terminal"):
                 return END
             return "plan_and_schedule"
 
@@ -69,9 +80,13 @@ class PlanAndExecuteGraph:
         async def join(state):
             logging.info("Joining and summarizing...")
             joined = await self.joiner.joiner.ainvoke(state)
-            logging.info(f"Joined: {joined}")
+            logging.debug("Joined: %s", joined)
+            # A final answer ends the loop; a replan ends with a SystemMessage
+            terminal = isinstance(joined["messages"][-1], AIMessage)
+            self._pending_plan.settle(terminal)
             return {
-                "messages": joined["messages"]
+                "messages": joined["messages"],
+                "terminal": terminal,
             }
             
         logging.info("Creating planning graph...")
@@ -84,6 +99,5 @@ class PlanAndExecuteGraph:
         planning_graph.add_conditional_edges("join", should_continue)
         planning_graph.add_edge(START, "plan_and_schedule")
 
-        return planning_graph.compile({
-        "recursion_limit": 100,
-    })
+        # Runs with the parent graph's checkpointer and recursion_limit
+        return planning_graph.compile()
@@ -0,0 +1,87 @@
+import copy
+import hashlib
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import BaseTool
+
+from common.cache import TTLCache
+from client.llm_compiler.output_parser import Task
+
+
+class PlanCache:
+    """Expiring LRU cache of parsed plans, keyed by the tool set and the conversation.
+
+    Plans are stored by tool name and rebound to the caller's tools on a hit,
+    so a plan made in one session can be replayed with another session's
+    MCP client.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60 * 60.0):
+        self._plans = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def key(tool_descriptions: str, messages: Iterable[BaseMessage]) -> str:
+        digest = hashlib.sha256(tool_descriptions.encode())
+        for message in messages:
+            digest.update(b"\x1e" + message.type.encode() + b"\x1f" + str(message.content).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, tools: Mapping[str, BaseTool]) -> Optional[List[Task]]:
+        plan = self._plans.get(key)
+        if plan is None:
+            return None
+        # Fresh args per replay; the executor must never share dicts with the cache
+        return [
+            Task(
+                idx=idx,
+                tool=tool_name if tool_name == "join" else tools[tool_name],
+                args=copy.deepcopy(args),
+                dependencies=dependencies,
+                thought=thought,
+            )
+            for idx, tool_name, args, dependencies, thought in plan
+        ]
+
+    def put(self, key: str, tasks: Iterable[Task]) -> None:
+        plan = tuple(
+            (
+                task["idx"],
+                task["tool"] if isinstance(task["tool"], str) else task["tool"].name,
+                copy.deepcopy(task["args"]),
+                task["dependencies"],
+                task["thought"],
+            )
+            for task in tasks
+        )
+        self._plans.put(key, plan)
+
+
+class PendingPlan:
+    """A turn's freshly planned tasks, cached only once the joiner accepts their results."""
+
+    def __init__(self, cache: PlanCache):
+        self.cache = cache
+        self._plan = None
+
+    def hold(
+        self,
+        key: Optional[str],
+        tasks: Sequence[Task],
+        observations: Iterable[BaseMessage],
+    ) -> None:
+        """Keep a plan whose tool calls all succeeded; drop anything held before."""
+        failed = any(
+            str(message.content).startswith(("ERROR(", "Traceback")) for message in observations
+        )
+        self._plan = (key, list(tasks)) if key is not None and tasks and not failed else None
+
+    def settle(self, final: bool) -> None:
+        """Cache the held plan if the joiner gave a final answer, and forget it either way."""
+        plan, self._plan = self._plan, None
+        if final and plan is not None:
+            self.cache.put(*plan)
+
+
+# Shared by every session; entries for other tool sets simply never match
+PLAN_CACHE = PlanCache()
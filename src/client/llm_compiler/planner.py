@@ -1,23 +1,21 @@
 from __future__ import annotations
+import asyncio
 import getpass
 import logging
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from typing import List, Optional
 from langchain_core.messages import (
     FunctionMessage,
     SystemMessage,
 )
-from langchain import hub
 from langchain_core.runnables import RunnableBranch
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from client.llm_compiler.output_parser import LLMCompilerPlanParser
+from client.llm_compiler.prompts import pull_prompt
 from client.configuration.configuration import Configuration
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -28,15 +26,128 @@ if LANGSMITH_API_KEY is None:
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
-base_prompt = hub.pull("wfh/llm-compiler")
+base_prompt = pull_prompt("wfh/llm-compiler")
+
+def should_replan(state: list):
+    # Context is passed as a system message
+    return isinstance(state[-1], SystemMessage)
+
+
+def wrap_messages(state: list):
+    return {"messages": state}
+
+
+def wrap_and_get_last_index(state: list):
+    next_task = 0
+    for message in state[::-1]:
+        if isinstance(message, FunctionMessage):
+            next_task = message.additional_kwargs["idx"] + 1
+            break
+    # Copy the replan context instead of editing it in place: the message is
+    # shared with the graph state and would otherwise accumulate suffixes.
+    context = state[-1]
+    context = context.model_copy(
+        update={"content": context.content + f" - Begin counting at : {next_task}"}
+    )
+    return {"messages": state[:-1] + [context]}
+
+
+REPLAN_INSTRUCTIONS = (
+    ' - You are given "Previous Plan" which is the plan that the previous agent created along with the execution results '
+    "(given as Observation) of each plan and a general thought (given as Thought) about the executed results."
+    'You MUST use these information to create the next plan under "Current Plan".\n'
+    ' - When starting the Current Plan, you should start with "Thought" that outlines the strategy for the next plan.\n'
+    " - In the Current Plan, you should NEVER repeat the actions that are already executed in the Previous Plan.\n"
+    " - You must continue the task index from the end of the previous one. Do not repeat task indices."
+)
+
+
+@lru_cache(maxsize=16)
+def build_plan_prompts(tool_descriptions: str, num_tools: int):
+    """Planner and replanner prompts for a tool set, shared by every session using it."""
+    planner_prompt = base_prompt.partial(
+        replan="",
+        num_tools=num_tools,
+        tool_descriptions=tool_descriptions,
+    )
+    replanner_prompt = base_prompt.partial(
+        replan=REPLAN_INSTRUCTIONS,
+        num_tools=num_tools,
+        tool_descriptions=tool_descriptions,
+    )
+    return planner_prompt, replanner_prompt
+
+
+class _MCPClientOwner:
+    """Keeps one MultiServerMCPClient open inside a dedicated task.
+
+    MCP transports are anyio task-scoped: the task that enters the client must
+    be the one that exits it. The owner task enters it, parks until close(),
+    then exits it, so sessions on any task can call its tools and release it.
+    """
+
+    def __init__(self, connections: dict):
+        self.refs = 0
+        self._ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(connections))
+
+    async def _run(self, connections: dict):
+        try:
+            async with MultiServerMCPClient(connections) as client:
+                self._ready.set_result(client)
+                await self._stop.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            raise
+
+    async def client(self) -> MultiServerMCPClient:
+        return await asyncio.shield(self._ready)
 
-@dataclass
-class CompilerState:
-    """State object that flows through the LangGraph nodes."""
+    async def close(self):
+        self._stop.set()
+        await asyncio.gather(self._task, return_exceptions=True)
 
-    question: str
-    plan: Optional[str] = None
-    stack: List[str] = None 
+
+class SharedMCPClients:
+    """Process-wide MCP clients, one per server config file.
+
+    Sessions acquire the client for their config and release it when done;
+    the servers are spawned by the first user and shut down with the last.
+    """
+
+    def __init__(self):
+        # config path -> owner task holding the client and its reference count
+        self._owners: dict[str, _MCPClientOwner] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, config: Configuration) -> MultiServerMCPClient:
+        async with self._lock:
+            owner = self._owners.get(config.mcp_config_path)
+            if owner is None:
+                owner = _MCPClientOwner(config.load_config()["mcpServers"])
+                try:
+                    await owner.client()
+                except BaseException:
+                    await owner.close()
+                    raise
+                self._owners[config.mcp_config_path] = owner
+            owner.refs += 1
+            return await owner.client()
+
+    async def release(self, config: Configuration) -> None:
+        async with self._lock:
+            owner = self._owners.get(config.mcp_config_path)
+            if owner is None:
+                return
+            owner.refs -= 1
+            if owner.refs == 0:
+                del self._owners[config.mcp_config_path]
+                await owner.close()
+
+
+MCP_CLIENTS = SharedMCPClients()
 
 
 class Planner:
@@ -46,61 +157,49 @@ class Planner:
         self.llm = llm
         self.planner = None
         self.replanner = None
-        self.base_prompt = base_prompt
         self.tools = None
+        self.tools_by_name = None
+        self.tool_descriptions = None
         self.model = None
         self.client = None
-        
+
 
     async def init_client_and_tools(self):
         """Start client and fetch tools (keeping session open)."""
         if self.client is None:
-            connections = self.config.load_config()["mcpServers"]
-            self.client = MultiServerMCPClient(connections)
-            await self.client.__aenter__()
+            self.client = await MCP_CLIENTS.acquire(self.config)
+
+        # Snapshot the tool list once per client; it only changes on reconnect
+        if self.tools is None:
+            self.tools = self.client.get_tools()
+            self.tools_by_name = {tool.name: tool for tool in self.tools}
+            self.tool_descriptions = "\n".join(
+                f"{i+1}. {tool.name}: {tool.description}"
+                for i, tool in enumerate(self.tools)
+            )
+
+    async def release(self):
+        """Give back the shared MCP client; the last user closes it."""
+        if self.client is None:
+            return
+        await MCP_CLIENTS.release(self.config)
+        self.client = None
+        # The tools, and the model bound to them, belong to the released client
+        self.tools = None
+        self.tools_by_name = None
+        self.tool_descriptions = None
+        self.model = None
 
-        self.tools = self.client.get_tools()
     async def create_planner(self):
         logging.info("Getting tools from the config...")
         """Get the tools from the config."""
         await self.init_client_and_tools()
-        logging.info(f"tools: {self.tools}")
+        logging.debug("tools: %s", self.tools)
         """Create the planner and replanner."""
-        tool_descriptions = "\n".join(
-            f"{i+1}. {tool.name}: {tool.description}"
-            for i, tool in enumerate(self.tools)
-        )
-        planner_prompt = self.base_prompt.partial(
-            replan="",
-            num_tools=len(self.tools)
-            + 1,  # Add one because we're adding the join() tool at the end.
-            tool_descriptions=tool_descriptions,
-        )
-        replanner_prompt = self.base_prompt.partial(
-            replan=' - You are given "Previous Plan" which is the plan that the previous agent created along with the execution results '
-            "(given as Observation) of each plan and a general thought (given as Thought) about the executed results."
-            'You MUST use these information to create the next plan under "Current Plan".\n'
-            ' - When starting the Current Plan, you should start with "Thought" that outlines the strategy for the next plan.\n'
-            " - In the Current Plan, you should NEVER repeat the actions that are already executed in the Previous Plan.\n"
-            " - You must continue the task index from the end of the previous one. Do not repeat task indices.",
-            num_tools=len(self.tools) + 1,
-            tool_descriptions=tool_descriptions,
+        planner_prompt, replanner_prompt = build_plan_prompts(
+            self.tool_descriptions,
+            len(self.tools) + 1,  # Add one because we're adding the join() tool at the end.
         )
-        def should_replan(state: list):
-            # Context is passed as a system message
-            return isinstance(state[-1], SystemMessage)
-
-        def wrap_messages(state: list):
-            return {"messages": state}
-
-        def wrap_and_get_last_index(state: list):
-            next_task = 0
-            for message in state[::-1]:
-                if isinstance(message, FunctionMessage):
-                    next_task = message.additional_kwargs["idx"] + 1
-                    break
-            state[-1].content = state[-1].content + f" - Begin counting at : {next_task}"
-            return {"messages": state}
         self.model =  (
             RunnableBranch(
                 (should_replan, wrap_and_get_last_index | replanner_prompt),
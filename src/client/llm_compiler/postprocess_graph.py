@@ -1,19 +1,35 @@
+import hashlib
 import logging
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.graph import StateGraph
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import (
     chain as as_runnable,
 )
+from common.cache import TTLCache
+from client.llm_compiler.joiner import select_recent_messages
 from client.llm_compiler.state import State
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+SUMMARY_CACHE_TTL = 24 * 60 * 60.0
+SUMMARY_CACHE_MAXSIZE = 512
+_SUMMARY_CACHE = TTLCache(maxsize=SUMMARY_CACHE_MAXSIZE, ttl=SUMMARY_CACHE_TTL)
+
+
+SUMMARIZATION_PROMPT = ChatPromptTemplate.from_template("""
+You are a helpful assistant. Based on the user's question and the content retrieved using tools, provide a clear answer.
+
+User question:
+{question}
+
+Retrieved content:
+{tool_output}
+""")
+
 
 class PostprocessingGraph:
     def __init__(self, llm):
         self.llm = llm
+        self.summarizer = SUMMARIZATION_PROMPT | self.llm
         self.subgraph = None
 
     async def build_subgraph(self):
@@ -23,22 +39,24 @@ class PostprocessingGraph:
         async def summarize_if_needed(state):
             last_msg = state["messages"][-1]
             if isinstance(last_msg, AIMessage) and "All tasks completed" in last_msg.content:
-                summarization_prompt = ChatPromptTemplate.from_template("""
-                You are a helpful assistant. Based on the user's question and the content retrieved using tools, provide a clear answer.
-
-                User question:
-                {question}
-
-                Retrieved content:
-                {tool_output}
-                """)
-                summarizer = summarization_prompt | self.llm
-                context = "\n".join(
-                    [msg.content for msg in state["messages"] if hasattr(msg, "content")]
+                # Summarize the current turn: its question and everything after it
+                recent = select_recent_messages(state)["messages"]
+                question = recent[0].content if isinstance(recent[0], HumanMessage) else ""
+                tool_output = "\n".join(str(msg.content) for msg in recent[1:])
+                context = f"{question}\x1e{tool_output}"
+                # Same model and same context give the same summary; skip the call
+                cache_key = hashlib.sha256(
+                    f"{getattr(self.llm, 'model', '')}\x1f{context}".encode()
+                ).hexdigest()
+                cached = _SUMMARY_CACHE.get(cache_key)
+                if cached is not None:
+                    return {"messages": [AIMessage(content=cached)]}
+                summary = await self.summarizer.ainvoke(
+                    {"question": question, "tool_output": tool_output}
                 )
-                summary = await summarizer.ainvoke({"context": context})
-                return {"messages": state["messages"] + [AIMessage(content=summary.content)]}
-            return state
+                _SUMMARY_CACHE.put(cache_key, summary.content)
+                return {"messages": [AIMessage(content=summary.content)]}
+            return {}
 
         postprocessing_graph = StateGraph(State)
         postprocessing_graph.add_node("summarize_if_needed", summarize_if_needed)
@@ -0,0 +1,49 @@
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from langchain import hub
+from langchain_core.load import dumps, loads
+
+PROMPT_CACHE_DIR = Path(
+    os.getenv("PROMPT_CACHE_DIR") or Path.home() / ".cache" / "ai-agent" / "prompts"
+)
+# Cached copies older than this are pulled again so Hub edits are picked up
+PROMPT_CACHE_TTL = float(os.getenv("PROMPT_CACHE_TTL") or 24 * 60 * 60)
+
+
+@lru_cache(maxsize=8)
+def pull_prompt(prompt_id: str):
+    """Pull a LangChain Hub prompt once per process, backed by an on-disk copy.
+
+    Only the first run within PROMPT_CACHE_TTL pays the Hub round trip; later
+    runs load the serialized prompt from PROMPT_CACHE_DIR. If the Hub cannot
+    be reached, a stale copy is used rather than failing the import.
+    """
+    path = PROMPT_CACHE_DIR / f"{prompt_id.replace('/', '_')}.json"
+    cached = None
+    if path.exists():
+        try:
+            cached = loads(path.read_text())
+        except Exception as e:
+            logging.warning("Ignoring unreadable prompt cache %s: %s", path, e)
+        else:
+            if time.time() - path.stat().st_mtime < PROMPT_CACHE_TTL:
+                return cached
+
+    try:
+        prompt = hub.pull(prompt_id)
+    except Exception as e:
+        if cached is None:
+            raise
+        logging.warning("Using stale cached prompt %s: %s", prompt_id, e)
+        return cached
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(dumps(prompt))
+    except OSError as e:
+        logging.warning("Could not cache prompt %s: %s", prompt_id, e)
+    return prompt
@@ -1,7 +1,11 @@
-from typing import Annotated, TypedDict
+from typing import Annotated
+from typing_extensions import NotRequired, TypedDict
 from langgraph.graph.message import add_messages
 
 
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    classification: NotRequired[str]
+    # Set by the planning subgraph's join: True once it produced a final answer
+    terminal: NotRequired[bool]
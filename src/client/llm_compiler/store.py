@@ -0,0 +1,91 @@
+import copy
+from typing import Iterable
+
+from langgraph.store.base import (
+    BaseStore,
+    GetOp,
+    ListNamespacesOp,
+    MatchCondition,
+    Op,
+    PutOp,
+    Result,
+    SearchOp,
+)
+from langgraph.store.memory import InMemoryStore
+
+
+class SharedStore(InMemoryStore):
+    """InMemoryStore whose namespaces can be dropped a whole session at a time."""
+
+    def drop(self, prefix: tuple[str, ...]) -> None:
+        """Forget every namespace under `prefix`, including empty ones left by missed gets."""
+        for namespace in [ns for ns in self._data if ns[: len(prefix)] == prefix]:
+            del self._data[namespace]
+            self._vectors.pop(namespace, None)
+
+
+# One store for the whole process; sessions only see their own namespace of it
+SHARED_STORE = SharedStore()
+
+
+class NamespacedStore(BaseStore):
+    """View of a shared store confined to the namespaces under `prefix`.
+
+    Every operation is rewritten to the prefixed namespace, and results come
+    back with the prefix stripped, so graph nodes use it like a private store.
+    """
+
+    def __init__(self, store: SharedStore, prefix: tuple[str, ...]):
+        self.store = store
+        self.prefix = prefix
+
+    def _strip(self, item):
+        if item is None:
+            return None
+        # Items are the shared store's own objects; never edit them in place
+        item = copy.copy(item)
+        item.namespace = item.namespace[len(self.prefix):]
+        return item
+
+    def _scope(self, op: Op) -> Op:
+        if isinstance(op, (GetOp, PutOp)):
+            return op._replace(namespace=self.prefix + tuple(op.namespace))
+        if isinstance(op, SearchOp):
+            return op._replace(namespace_prefix=self.prefix + tuple(op.namespace_prefix))
+        if isinstance(op, ListNamespacesOp):
+            conditions = [
+                MatchCondition(match_type="prefix", path=self.prefix + tuple(c.path))
+                if c.match_type == "prefix"
+                else c
+                for c in op.match_conditions or ()
+            ]
+            if not any(c.match_type == "prefix" for c in conditions):
+                conditions.append(MatchCondition(match_type="prefix", path=self.prefix))
+            return op._replace(
+                match_conditions=tuple(conditions),
+                max_depth=None if op.max_depth is None else op.max_depth + len(self.prefix),
+            )
+        raise ValueError(f"Unknown operation type: {type(op)}")
+
+    def _unscope(self, op: Op, result: Result) -> Result:
+        if isinstance(op, GetOp):
+            return self._strip(result)
+        if isinstance(op, SearchOp):
+            return [self._strip(item) for item in result]
+        if isinstance(op, ListNamespacesOp):
+            return [namespace[len(self.prefix):] for namespace in result]
+        return result
+
+    def batch(self, ops: Iterable[Op]) -> list[Result]:
+        ops = list(ops)
+        results = self.store.batch([self._scope(op) for op in ops])
+        return [self._unscope(op, result) for op, result in zip(ops, results)]
+
+    async def abatch(self, ops: Iterable[Op]) -> list[Result]:
+        ops = list(ops)
+        results = await self.store.abatch([self._scope(op) for op in ops])
+        return [self._unscope(op, result) for op, result in zip(ops, results)]
+
+    def close(self) -> None:
+        """Drop this session's items from the shared store."""
+        self.store.drop(self.prefix)
@@ -0,0 +1,8 @@
+import logging
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Configure root logging once, from the process entry point."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
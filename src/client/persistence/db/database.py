@@ -1,6 +1,7 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+import orjson
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +11,10 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or 20)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 40)
+# Per-connection cache of server-side prepared statements (asyncpg)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE") or 500)
 
 if not all([DB_USER, DB_PASSWORD, DB_NAME]):
     raise RuntimeError("DB_USER, DB_PASSWORD, and DB_NAME must be set in .env")
@@ -17,8 +22,17 @@ if not all([DB_USER, DB_PASSWORD, DB_NAME]):
 DATABASE_URL = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
-engine = create_async_engine(DATABASE_URL, echo=False)
-AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    connect_args={"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+)
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 Base = declarative_base()
 
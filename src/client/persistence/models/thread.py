@@ -1,13 +1,41 @@
-from sqlalchemy import Column, String, JSON, DateTime, PrimaryKeyConstraint, select
+import logging
+from typing import Optional
+
+from sqlalchemy import Column, String, JSON, DateTime, PrimaryKeyConstraint, cast, func, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from datetime import datetime
 from client.persistence.db.database import Base, AsyncSessionLocal
 
+
+def _snapshot_messages(snapshot) -> list[dict]:
+    """Messages of the newest checkpoint found anywhere in an old full snapshot."""
+    latest = None
+    stack = [snapshot]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            values = node.get("channel_values")
+            if isinstance(values, dict) and isinstance(values.get("messages"), list):
+                # Checkpoint ids are time-ordered uuid6 strings
+                if latest is None or str(node.get("id", "")) > str(latest.get("id", "")):
+                    latest = node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    if latest is None:
+        return []
+    return [
+        message
+        for message in latest["channel_values"]["messages"]
+        if isinstance(message, dict) and "type" in message and "data" in message
+    ]
+
+
 class UserThread(Base):
     __tablename__ = "user_threads"
 
     user_id = Column(String, nullable=False)
     thread_id = Column(String, nullable=False)
-    store = Column(JSON)
     checkpoint = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -15,37 +43,105 @@ class UserThread(Base):
         PrimaryKeyConstraint("user_id", "thread_id"),
     )
 
+    @property
+    def is_snapshot(self) -> bool:
+        """Whether the row still holds a full checkpointer snapshot from before message lists."""
+        return bool(self.checkpoint) and not isinstance(self.checkpoint.get("messages"), list)
+
+    def messages(self) -> list[dict]:
+        """Serialized messages of the thread, in either storage format."""
+        if self.is_snapshot:
+            logging.warning(
+                "Thread %s is stored as a full snapshot; restoring its latest messages",
+                self.thread_id,
+            )
+            return _snapshot_messages(self.checkpoint)
+        return (self.checkpoint or {}).get("messages", [])
+
+    @classmethod
+    async def save_messages(
+        cls,
+        user_id: str,
+        thread_id: str,
+        messages: list[dict],
+        persisted: Optional[list[dict]],
+    ) -> list[dict]:
+        """Store the thread's serialized messages and return what is now stored.
+
+        `persisted` is what the previous call returned (None if unknown). While
+        it is an unchanged prefix of `messages` only the new tail is sent;
+        messages that were replaced or removed rewrite the whole list.
+        """
+        if persisted is not None and messages[:len(persisted)] == persisted:
+            if len(messages) > len(persisted):
+                await cls.append_messages(user_id, thread_id, messages[len(persisted):])
+        else:
+            await cls.replace_messages(user_id, thread_id, messages)
+        return messages
+
     @classmethod
-    async def save_or_update(cls, user_id: str, thread_id: str, store: dict, checkpoint: dict):
+    async def append_messages(
+        cls,
+        user_id: str,
+        thread_id: str,
+        messages: list[dict],
+    ):
+        """Append serialized messages to the thread's checkpoint.
+
+        Only the new messages are sent; Postgres concatenates them onto the
+        stored list, creating the row on the first turn.
+        """
+        stored = func.coalesce(cast(cls.checkpoint, JSONB)["messages"], cast([], JSONB))
+        stmt = insert(cls).values(
+            user_id=user_id,
+            thread_id=thread_id,
+            checkpoint={"messages": messages},
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.thread_id],
+            set_={
+                "checkpoint": cast(
+                    func.jsonb_build_object("messages", stored.op("||")(cast(messages, JSONB))),
+                    JSON,
+                )
+            },
+        )
         async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(cls).where(cls.user_id == user_id, cls.thread_id == thread_id)
-            )
-            existing = result.scalar_one_or_none()
-            if existing:
-                existing.store = store
-                existing.checkpoint = checkpoint
-            else:
-                session.add(cls(
-                    user_id=user_id,
-                    thread_id=thread_id,
-                    store=store,
-                    checkpoint=checkpoint
-                ))
+            await session.execute(stmt)
+            await session.commit()
+
+    @classmethod
+    async def replace_messages(
+        cls,
+        user_id: str,
+        thread_id: str,
+        messages: list[dict],
+    ):
+        """Overwrite the thread's stored messages, creating the row if needed."""
+        stmt = insert(cls).values(
+            user_id=user_id,
+            thread_id=thread_id,
+            checkpoint={"messages": messages},
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.thread_id],
+            set_={"checkpoint": stmt.excluded.checkpoint},
+        )
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
             await session.commit()
 
     @classmethod
     async def load(cls, user_id: str, thread_id: str):
         async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(cls).where(cls.user_id == user_id, cls.thread_id == thread_id)
-            )
-            return result.scalar_one_or_none()
+            # Primary-key lookup
+            return await session.get(cls, (user_id, thread_id))
 
     @classmethod
-    async def list_threads(cls, user_id: str):
+    async def list_thread_ids(cls, user_id: str) -> list[str]:
+        """Thread ids of a user, without loading their stored state."""
         async with AsyncSessionLocal() as session:
             result = await session.execute(
-                select(cls).where(cls.user_id == user_id)
+                select(cls.thread_id).where(cls.user_id == user_id)
             )
-            return result.scalars().all()
+            return list(result.scalars().all())
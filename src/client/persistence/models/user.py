@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, DateTime, select
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime
 from client.persistence.db.database import Base, AsyncSessionLocal
 
@@ -11,12 +12,12 @@ class User(Base):
 
     @classmethod
     async def save_if_not_exists(cls, user_id: str, email: str):
+        stmt = insert(cls).values(user_id=user_id, email=email).on_conflict_do_nothing(
+            index_elements=[cls.user_id]
+        )
         async with AsyncSessionLocal() as session:
-            result = await session.execute(select(cls).where(cls.user_id == user_id))
-            user = result.scalar_one_or_none()
-            if not user:
-                session.add(cls(user_id=user_id, email=email))
-                await session.commit()
+            await session.execute(stmt)
+            await session.commit()
 
     @classmethod
     async def get_by_email(cls, email: str):
@@ -2,41 +2,52 @@ import asyncio
 import logging
 import uuid
 
+from client.logging_config import setup_logging
+
+# Configure logging before the imports below, which log while they load
+setup_logging()
+
 from langchain_core.messages import HumanMessage, AIMessage
 
-from authentication.auth import start_email_service
+from authentication.auth import get_google_service_instance, start_email_service
 
 from client.configuration.configuration import Configuration
 from client.llm_compiler.agent import LangGraphWorkflow
 from client.persistence.init_db import init_db
 from client.persistence.models.thread import UserThread
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
 
 async def main() -> None:
     """Initialize and run the chat session."""
     mcp_config_path = "src/client/configuration/servers_config.json"
     config = Configuration(mcp_config_path)
-    await init_db()
+    # Table creation and the Google token load/refresh are independent I/O;
+    # only storing the user needs both, so overlap them.
+    await asyncio.gather(
+        init_db(),
+        asyncio.to_thread(get_google_service_instance),
+    )
     google_service = await start_email_service()
     print(
         f"\n✅ User authenticated:\n - Email: {google_service.user_email}\n - User ID: {google_service.user_id}"
     )
 
     # Step 2: List existing sessions
-    threads = await UserThread.list_threads(google_service.user_id)
-    if threads:
+    thread_ids = await UserThread.list_thread_ids(google_service.user_id)
+    if thread_ids:
         print("\nAvailable threads:")
-        for s in threads:
-            print(f"- {s.thread_id}")
+        for thread_id in thread_ids:
+            print(f"- {thread_id}")
     else:
         print("\nNo previous sessions found.")
 
     # Step 3: Let user choose or create
-    choice = input("\nEnter session ID to resume or type 'new' to create one: ").strip()
+    choice = (
+        await asyncio.to_thread(
+            input, "\nEnter session ID to resume or type 'new' to create one: "
+        )
+    ).strip()
     if choice.lower() == "new":
         thread_id = str(uuid.uuid4())
         workflow = LangGraphWorkflow(config, google_service.user_id, thread_id)
@@ -48,27 +59,28 @@ async def main() -> None:
                 config, google_service.user_id, thread_id
             )
         except Exception as e:
-            logging.error(f"Failed to load session: {e}")
+            logging.error("Failed to load session: %s", e)
             return
     graph = await workflow.build_graph()
+    run_config = {
+        "recursion_limit": config.recursion_limit,
+        "configurable": {"thread_id": thread_id},
+    }
     try:
         while True:
-            user_input = input("You: ").strip()
+            # Read stdin on a worker thread so the event loop stays live
+            user_input = (await asyncio.to_thread(input, "You: ")).strip()
             if user_input.lower() in ["exit", "quit"]:
                 break
-            config = {"recursion_limit": 100,
-                          "configurable": {
-                              "thread_id": thread_id,
-                              }}
             inputs = {"messages": [HumanMessage(content=user_input)]}
-            result = await graph.ainvoke(inputs, config)
+            result = await graph.ainvoke(inputs, run_config)
+            await workflow.persist_session()
             ai_message_content = next((msg.content for msg in result["messages"] if isinstance(msg, AIMessage)), None)
             print("Result:", ai_message_content)
 
 
     finally:
-        if workflow.planner and workflow.planner.client:
-            await workflow.planner.client.__aexit__(None, None, None)
+        await workflow.close()
 
 
 
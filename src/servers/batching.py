@@ -0,0 +1,59 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.capacity = rate
+        self.tokens = rate
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.fill_rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+class BatchProcessor(Generic[T, R]):
+    """Runs an async function over many inputs with bounded concurrency and a rate limit.
+
+    Args:
+        fn: The coroutine function applied to each input.
+        max_concurrency: How many calls may be in flight at once.
+        rpm: How many calls may start per minute.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[T], Awaitable[R]],
+        max_concurrency: int = 10,
+        rpm: int = 100,
+    ):
+        self.fn = fn
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._limiter = RateLimiter(rpm, 60.0)
+
+    async def _one(self, item: T) -> R:
+        async with self._semaphore:
+            await self._limiter.acquire()
+            return await self.fn(item)
+
+    async def run_batch(self, inputs: Iterable[T]) -> list[R]:
+        """Process every input and return the results in input order."""
+        return await asyncio.gather(*(self._one(item) for item in inputs))
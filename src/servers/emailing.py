@@ -2,7 +2,6 @@ import asyncio
 import logging
 import base64
 from functools import wraps
-from email.header import decode_header
 from base64 import urlsafe_b64decode
 from email import message_from_bytes
 import webbrowser
@@ -11,29 +10,22 @@ from email.mime.multipart import MIMEMultipart
 from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 
+from client.logging_config import setup_logging
+
+# Configure logging before the imports below, which log while they load
+setup_logging()
+
 from mcp.server.fastmcp import FastMCP
-from authentication.auth import get_google_service_instance
+from authentication.auth import decode_mime_header, get_google_service_instance
 
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 google_service = None
 gmail_api = None
 
-def decode_mime_header(header: str) -> str:
-    decoded_parts = decode_header(header)
-    decoded_string = ''
-    for part, encoding in decoded_parts:
-        if isinstance(part, bytes):
-            decoded_string += part.decode(encoding or 'utf-8')
-        else:
-            decoded_string += part
-    return decoded_string
-
-
 def requires_gmail_auth(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
@@ -52,7 +44,7 @@ async def authenticate_gmail():
     google_service = get_google_service_instance()
     await google_service.authenticate_and_store_user()
     gmail_api = google_service.get_gmail_service()
-    logger.info(f"Authenticated Gmail user: {google_service.user_email}")
+    logger.info("Authenticated Gmail user: %s", google_service.user_email)
 
 
 @mcp.tool(description="Test tool to check if the server is running")
@@ -79,10 +71,10 @@ async def send_email(recipient_id: str, subject: str, message: str) -> dict:
         send_message = await asyncio.to_thread(
             gmail_api.users().messages().send(userId="me", body=create_message).execute
         )
-        logger.info(f"Message sent with ID: {send_message['id']}")
+        logger.info("Message sent with ID: %s", send_message["id"])
         return {"status": "success", "message_id": send_message["id"]}
     except HttpError as error:
-        logger.error(f"Gmail API error: {error}")
+        logger.error("Gmail API error: %s", error)
         return {"status": "error", "error_message": str(error)}
     except Exception as e:
         logger.exception("Unexpected error sending email")
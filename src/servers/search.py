@@ -1,22 +1,59 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 import os
 import httpx
 import logging
+import orjson
+
+from common.cache import TTLCache
+from servers.batching import BatchProcessor
 
 load_dotenv()
 
-mcp = FastMCP("internet search")
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 
 if not SERPAPI_API_KEY:
     logging.error("SERPAPI_API_KEY environment variable is not set!")
     raise ValueError("SERPAPI_API_KEY environment variable is required")
 else:
-    logging.info(f"API Key found (starts with): {SERPAPI_API_KEY}...")
+    logging.info("API Key found (starts with): %s...", SERPAPI_API_KEY[:4])
 
 SERPER_URL = "https://google.serper.dev/search"
 
+# One pooled client for the server's lifetime so TCP/TLS to Serper is reused
+_CLIENT = httpx.AsyncClient(
+    timeout=30.0,
+    headers={
+        "X-API-KEY": SERPAPI_API_KEY,
+        "Content-Type": "application/json",
+    },
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Close the shared HTTP client when the MCP server shuts down."""
+    try:
+        yield
+    finally:
+        await _CLIENT.aclose()
+
+
+mcp = FastMCP("internet search", lifespan=lifespan)
+
+# Upper bound on Serper requests in flight / started per minute for batched searches
+MAX_CONCURRENT_SEARCHES = 8
+SEARCH_RPM = 100
+
+# Successful Serper responses keyed by (query, num, site)
+SEARCH_CACHE_TTL = 600.0
+SEARCH_CACHE_MAXSIZE = 1024
+_SEARCH_CACHE = TTLCache(maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL)
+
+
 @mcp.tool(description="Search the web using Serper.dev")
 async def search_web(query: str, num: int = 3, site: str | None = None) -> dict:
     """
@@ -30,31 +67,61 @@ async def search_web(query: str, num: int = 3, site: str | None = None) -> dict:
     Returns:
         JSON response from Serper (contains 'organic' list of results).
     """
-    q = f"{'site:' + site if site else ''} {query}".strip()
+    cache_key = (query, num, site)
+    cached = _SEARCH_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    q = f"site:{site} {query}" if site else query
     payload = {"q": q }
 
-    headers = {
-        "X-API-KEY": SERPAPI_API_KEY,
-        "Content-Type": "application/json",
-    }
-
-    async with httpx.AsyncClient() as client:
-        try:
-            logging.info(f"Making request to Serper.dev with query: {q}")
-            resp = await client.post(SERPER_URL, headers=headers, json=payload, timeout=30.0)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            logging.error(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
-            if e.response.status_code == 403:
-                logging.error("403 Forbidden - Please check your SERPAPI_API_KEY")
-            return {"organic": []}
-        except httpx.RequestError as e:
-            logging.error(f"Request error occurred: {str(e)}")
-            return {"organic": []}
-        except Exception as e:
-            logging.error(f"Unexpected error: {str(e)}")
-            return {"organic": []}
+    try:
+        logging.info("Making request to Serper.dev with query: %s", q)
+        resp = await _CLIENT.post(SERPER_URL, content=orjson.dumps(payload))
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        _SEARCH_CACHE.put(cache_key, data)
+        return data
+    except httpx.HTTPStatusError as e:
+        logging.error("HTTP error occurred: %s - %s", e.response.status_code, e.response.text)
+        if e.response.status_code == 403:
+            logging.error("403 Forbidden - Please check your SERPAPI_API_KEY")
+        return {"organic": []}
+    except httpx.RequestError as e:
+        logging.error("Request error occurred: %s", e)
+        return {"organic": []}
+    except Exception as e:
+        logging.error("Unexpected error: %s", e)
+        return {"organic": []}
+
+
+@mcp.tool(description="Search the web for several queries at once using Serper.dev")
+async def search_web_many(
+    queries: list[str], num: int = 3, site: str | None = None
+) -> list[dict]:
+    """
+    Runs several Serper.dev searches concurrently.
+
+    Args:
+        queries: The free-text search queries.
+        num: How many top results to return per query.
+        site: If provided, restricts every search to a specific domain.
+
+    Returns:
+        One Serper JSON response per query, in the same order as `queries`.
+    """
+    return await _SEARCH_BATCHER.run_batch((query, num, site) for query in queries)
+
+
+async def _search_one(args: tuple[str, int, str | None]) -> dict:
+    query, num, site = args
+    return await search_web(query, num=num, site=site)
+
+
+_SEARCH_BATCHER = BatchProcessor(
+    _search_one, max_concurrency=MAX_CONCURRENT_SEARCHES, rpm=SEARCH_RPM
+)
+
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
@@ -1,9 +1,25 @@
+import asyncio
+
 import httpx
 from bs4 import BeautifulSoup
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("website browsing")
 
+# Pages larger than this are parsed off the event loop
+PARSE_IN_THREAD_THRESHOLD = 64_000
+
+
+def extract_text(html: str) -> str:
+    """
+    Extracts the visible text from an HTML document.
+
+    Args:
+        html: The raw HTML.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text(separator="\n")
+
 
 async def fetch_url_text(url: str, timeout: float = 30.0) -> str:
     """
@@ -17,10 +33,12 @@ async def fetch_url_text(url: str, timeout: float = 30.0) -> str:
         try:
             resp = await client.get(url, timeout=timeout)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            return soup.get_text(separator="\n")
         except httpx.HTTPError:
             return ""
+    html = resp.text
+    if len(html) > PARSE_IN_THREAD_THRESHOLD:
+        return await asyncio.to_thread(extract_text, html)
+    return extract_text(html)
 
 @mcp.tool(description="Fetch text from a website")
 async def website_browsing(url: str = None) -> str:
@@ -0,0 +1,11 @@
+import os
+
+# database.py refuses to import without credentials; tests never connect
+for name, value in {
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,127 @@
+import asyncio
+import operator
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from client.llm_compiler.checkpoint import BufferedSaver
+from client.llm_compiler.state import State
+
+
+class Counter(TypedDict):
+    steps: Annotated[list, operator.add]
+
+
+def _counter_graph(saver):
+    builder = StateGraph(Counter)
+    for name in ("a", "b", "c"):
+        builder.add_node(name, lambda state, name=name: {"steps": [name]})
+    builder.add_edge(START, "a")
+    builder.add_edge("a", "b")
+    builder.add_edge("b", "c")
+    builder.add_edge("c", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id="t1"):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def _checkpoint(saver, value, previous=None):
+    checkpoint = empty_checkpoint()
+    version = saver.get_next_version(previous, None)
+    checkpoint["channel_values"] = {"value": value}
+    checkpoint["channel_versions"] = {"value": version}
+    return checkpoint, {"value": version}
+
+
+def test_puts_coalesce_into_one_flush():
+    saver = BufferedSaver()
+    graph = _counter_graph(saver)
+
+    graph.invoke({"steps": []}, _config())
+    assert not saver.storage["t1"][""]
+
+    saver.flush()
+    assert len(saver.storage["t1"][""]) == 1
+    assert graph.get_state(_config()).values == {"steps": ["a", "b", "c"]}
+
+
+def test_superseded_pending_writes_are_dropped():
+    saver = BufferedSaver()
+    first, first_versions = _checkpoint(saver, 1)
+    first_config = saver.put(_config(), first, {}, first_versions)
+    saver.put_writes(first_config, [("value", 2)], "task-1")
+
+    second, second_versions = _checkpoint(saver, 2, first_versions["value"])
+    second_config = saver.put(first_config, second, {}, second_versions)
+    saver.put_writes(second_config, [("value", 3)], "task-2")
+    saver.flush()
+
+    assert list(saver.storage["t1"][""]) == [second["id"]]
+    assert ("t1", "", first["id"]) not in saver.writes
+    assert [write[0] for write in saver.writes[("t1", "", second["id"])].values()] == ["task-2"]
+
+
+def test_get_tuple_and_list_see_unflushed_checkpoints():
+    saver = BufferedSaver()
+    checkpoint, versions = _checkpoint(saver, 1)
+    config = saver.put(_config(), checkpoint, {}, versions)
+    saver.put_writes(config, [("value", 2)], "task-1")
+
+    latest = saver.get_tuple(_config())
+    assert latest.checkpoint["id"] == checkpoint["id"]
+    assert latest.checkpoint["channel_values"] == {"value": 1}
+    assert [(task_id, channel, value) for task_id, channel, value in latest.pending_writes] == [
+        ("task-1", "value", 2)
+    ]
+
+    other, other_versions = _checkpoint(saver, 5)
+    saver.put(_config("t2"), other, {}, other_versions)
+    assert [item.checkpoint["id"] for item in saver.list(_config("t2"))] == [other["id"]]
+    assert {item.config["configurable"]["thread_id"] for item in saver.list(None)} == {"t1", "t2"}
+
+
+def test_thread_resumes_after_flush():
+    saver = BufferedSaver()
+    graph = _counter_graph(saver)
+
+    graph.invoke({"steps": []}, _config())
+    saver.flush()
+    result = graph.invoke({"steps": ["again"]}, _config())
+
+    assert result == {"steps": ["a", "b", "c", "again", "a", "b", "c"]}
+    saver.flush()
+    assert len(saver.storage["t1"][""]) == 2
+
+
+def test_restored_messages_survive_next_turn():
+    saver = BufferedSaver()
+    builder = StateGraph(State)
+    builder.add_node("simple_or_complex", lambda state: {"classification": "simple"})
+    builder.add_node("postprocess", lambda state: {"messages": [AIMessage(content="answer")]})
+    builder.add_edge(START, "simple_or_complex")
+    builder.add_edge("simple_or_complex", "postprocess")
+    builder.add_edge("postprocess", END)
+    graph = builder.compile(checkpointer=saver)
+
+    restored = [HumanMessage(content="earlier"), AIMessage(content="reply")]
+
+    async def run():
+        # Mirrors LangGraphWorkflow.build_graph seeding a loaded session
+        await graph.aupdate_state(_config(), {"messages": restored}, as_node="postprocess")
+        assert (await graph.aget_state(_config())).next == ()
+        return await graph.ainvoke({"messages": [HumanMessage(content="now")]}, _config())
+
+    result = asyncio.run(run())
+
+    assert [message.content for message in result["messages"]] == [
+        "earlier",
+        "reply",
+        "now",
+        "answer",
+    ]
+    assert result["classification"] == "simple"
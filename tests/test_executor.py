@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from client.llm_compiler.executor import schedule_tasks
+
+
+def _task(idx, tool, args, dependencies=()):
+    return {"idx": idx, "tool": tool, "args": args, "dependencies": list(dependencies), "thought": None}
+
+
+def _tool(name, coroutine):
+    return StructuredTool.from_function(coroutine=coroutine, name=name, description=name)
+
+
+def test_streamed_tasks_start_before_the_stream_ends_and_resolve_references():
+    async def run():
+        started = asyncio.Event()
+
+        async def lookup(query: str) -> str:
+            started.set()
+            return f"found {query}"
+
+        async def summarize(text: str) -> str:
+            return f"summary of {text}"
+
+        lookup_tool, summarize_tool = _tool("lookup", lookup), _tool("summarize", summarize)
+
+        async def plan():
+            yield _task(1, lookup_tool, {"query": "news"})
+            # Only reached if task 1 was dispatched while the plan is still streaming
+            await asyncio.wait_for(started.wait(), timeout=1)
+            yield _task(2, summarize_tool, {"text": "${1}"}, dependencies=[1])
+            yield _task(3, "join", (), dependencies=[1, 2])
+
+        return await schedule_tasks.ainvoke({"messages": [], "tasks": plan()})
+
+    messages = asyncio.run(run())
+
+    assert [(m.name, m.content) for m in messages] == [
+        ("lookup", "found news"),
+        ("summarize", "summary of found news"),
+        ("join", "join"),
+    ]
+    assert messages[1].additional_kwargs == {"idx": 2, "args": {"text": "${1}"}}
+
+
+def test_stream_failure_cancels_dispatched_tasks():
+    cancelled = []
+
+    async def run():
+        started = asyncio.Event()
+
+        async def wait_forever(query: str) -> str:
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+
+        slow_tool = _tool("slow", wait_forever)
+
+        async def plan():
+            yield _task(1, slow_tool, {"query": "first"})
+            yield _task(2, slow_tool, {"query": "second"})
+            await asyncio.wait_for(started.wait(), timeout=1)
+            raise RuntimeError("planner stream broke")
+
+        with pytest.raises(RuntimeError, match="planner stream broke"):
+            await schedule_tasks.ainvoke({"messages": [], "tasks": plan()})
+        # Checked before asyncio.run's shutdown would cancel any leftovers
+        assert sorted(cancelled) == ["first", "second"]
+
+    asyncio.run(run())
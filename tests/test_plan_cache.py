@@ -0,0 +1,104 @@
+from langchain_core.messages import AIMessage, FunctionMessage, HumanMessage
+from langchain_core.tools import tool
+
+from client.llm_compiler.plan_cache import PendingPlan, PlanCache
+
+
+@tool
+def search(query: str) -> str:
+    """Search the web."""
+    return query
+
+
+@tool
+def fetch(url: str) -> str:
+    """Fetch a page."""
+    return url
+
+
+TOOLS = {"search": search, "fetch": fetch}
+DESCRIPTIONS = "1. search: Search the web.\n2. fetch: Fetch a page."
+
+
+def _plan():
+    return [
+        {"idx": 1, "tool": search, "args": {"query": "news"}, "dependencies": [], "thought": None},
+        {"idx": 2, "tool": fetch, "args": {"url": "$1"}, "dependencies": [1], "thought": "open it"},
+        {"idx": 3, "tool": "join", "args": (), "dependencies": [1, 2], "thought": None},
+    ]
+
+
+def _observation(content, idx=1):
+    return FunctionMessage(name="search", content=content, additional_kwargs={"idx": idx})
+
+
+def test_key_depends_on_tools_and_message_types_and_content():
+    messages = [HumanMessage(content="hi")]
+    key = PlanCache.key(DESCRIPTIONS, messages)
+
+    assert PlanCache.key(DESCRIPTIONS, [HumanMessage(content="hi")]) == key
+    assert PlanCache.key(DESCRIPTIONS, [AIMessage(content="hi")]) != key
+    assert PlanCache.key(DESCRIPTIONS, [HumanMessage(content="hello")]) != key
+    assert PlanCache.key(DESCRIPTIONS + "\n3. mail: Send mail.", messages) != key
+
+
+def test_get_rebinds_tools_and_copies_args():
+    cache = PlanCache()
+    plan = _plan()
+    cache.put("k", plan)
+    plan[0]["args"]["query"] = "changed after put"
+
+    first = cache.get("k", TOOLS)
+    assert [task["tool"] for task in first] == [search, fetch, "join"]
+    assert first[0]["args"] == {"query": "news"}
+    assert first[1]["dependencies"] == [1]
+
+    first[0]["args"]["query"] = "changed by the executor"
+    assert cache.get("k", TOOLS)[0]["args"] == {"query": "news"}
+
+
+def test_plan_is_not_reused_after_the_tool_set_changes():
+    cache = PlanCache()
+    messages = [HumanMessage(content="latest news")]
+    cache.put(PlanCache.key(DESCRIPTIONS, messages), _plan())
+
+    changed = DESCRIPTIONS.replace("Fetch a page.", "Fetch a page as markdown.")
+    assert cache.get(PlanCache.key(changed, messages), TOOLS) is None
+    assert cache.get(PlanCache.key(DESCRIPTIONS, messages), TOOLS) is not None
+
+
+def test_expired_plans_are_not_returned():
+    cache = PlanCache(ttl=-1)
+    cache.put("k", _plan())
+    assert cache.get("k", TOOLS) is None
+
+
+def test_pending_plan_is_cached_only_after_a_final_answer():
+    cache = PlanCache()
+    pending = PendingPlan(cache)
+
+    pending.hold("replanned", _plan(), [_observation("ok")])
+    pending.settle(final=False)
+    pending.settle(final=True)
+    assert cache.get("replanned", TOOLS) is None
+
+    pending.hold("final", _plan(), [_observation("ok")])
+    pending.settle(final=True)
+    assert cache.get("final", TOOLS) is not None
+
+
+def test_pending_plan_skips_failed_reused_and_empty_plans():
+    cache = PlanCache()
+    pending = PendingPlan(cache)
+
+    for key, tasks, observations in [
+        ("error", _plan(), [_observation("ok"), _observation("ERROR(Failed to call search)", 2)]),
+        ("traceback", _plan(), [_observation("Traceback (most recent call last):")]),
+        (None, _plan(), [_observation("ok")]),
+        ("empty", [], [_observation("ok")]),
+    ]:
+        pending.hold(key, tasks, observations)
+        pending.settle(final=True)
+
+    for key in ("error", "traceback", "empty"):
+        assert cache.get(key, TOOLS) is None
@@ -0,0 +1,24 @@
+from client.llm_compiler.store import NamespacedStore, SharedStore
+
+
+def test_sessions_are_isolated_and_dropped_on_close():
+    shared = SharedStore()
+    alice = NamespacedStore(shared, ("alice", "t1"))
+    bob = NamespacedStore(shared, ("bob", "t1"))
+
+    alice.put(("notes",), "k", {"owner": "alice"})
+    bob.put(("notes",), "k", {"owner": "bob"})
+    # A miss still leaves an empty namespace behind in InMemoryStore
+    assert alice.get(("scratch",), "missing") is None
+
+    assert alice.get(("notes",), "k").value == {"owner": "alice"}
+    assert alice.get(("notes",), "k").namespace == ("notes",)
+    assert [item.value for item in bob.search(("notes",))] == [{"owner": "bob"}]
+    assert sorted(alice.list_namespaces()) == [("notes",), ("scratch",)]
+
+    alice.close()
+
+    assert not [ns for ns in shared._data if ns[:2] == ("alice", "t1")]
+    assert shared.list_namespaces() == [("bob", "t1", "notes")]
+    assert bob.get(("notes",), "k").value == {"owner": "bob"}
+    assert alice.get(("notes",), "k") is None
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, messages_from_dict, messages_to_dict
+
+from client.persistence.models.thread import UserThread
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    """Stand-in for the user_threads table, recording every write."""
+    rows = {"appended": [], "replaced": []}
+
+    async def append_messages(user_id, thread_id, messages):
+        rows["appended"].append(messages)
+        row = rows.setdefault((user_id, thread_id), {"messages": []})
+        row["messages"] = row["messages"] + messages
+
+    async def replace_messages(user_id, thread_id, messages):
+        rows["replaced"].append(messages)
+        rows[(user_id, thread_id)] = {"messages": messages}
+
+    async def load(user_id, thread_id):
+        return UserThread(user_id=user_id, thread_id=thread_id, checkpoint=rows[(user_id, thread_id)])
+
+    monkeypatch.setattr(UserThread, "append_messages", append_messages)
+    monkeypatch.setattr(UserThread, "replace_messages", replace_messages)
+    monkeypatch.setattr(UserThread, "load", load)
+    return rows
+
+
+def _turn(question, answer):
+    return [HumanMessage(content=question, id=question), AIMessage(content=answer, id=answer)]
+
+
+def test_persist_load_persist_appends_only_new_messages(rows):
+    first = _turn("q1", "a1")
+    second = _turn("q2", "a2")
+
+    async def run():
+        await UserThread.save_messages("u", "t", messages_to_dict(first), [])
+        row = await UserThread.load("u", "t")
+        stored = row.messages()
+        restored = messages_from_dict(stored)
+        return await UserThread.save_messages("u", "t", messages_to_dict(restored + second), stored)
+
+    persisted = asyncio.run(run())
+
+    assert rows["appended"] == [messages_to_dict(first), messages_to_dict(second)]
+    assert rows["replaced"] == []
+    assert persisted == rows[("u", "t")]["messages"] == messages_to_dict(first + second)
+
+
+def test_rewritten_history_replaces_stored_messages(rows):
+    first = _turn("q1", "a1")
+    persisted = asyncio.run(UserThread.save_messages("u", "t", messages_to_dict(first), []))
+
+    # add_messages replaced the answer in place by id
+    edited = [first[0], AIMessage(content="a1 (edited)", id="a1")]
+    asyncio.run(UserThread.save_messages("u", "t", messages_to_dict(edited), persisted))
+
+    assert rows["replaced"] == [messages_to_dict(edited)]
+    assert rows[("u", "t")]["messages"] == messages_to_dict(edited)
+
+
+def test_snapshot_rows_restore_latest_checkpoint_messages(caplog):
+    older, newer = _turn("q1", "a1"), _turn("q1", "a1") + _turn("q2", "a2")
+    row = UserThread(
+        user_id="u",
+        thread_id="t",
+        checkpoint={
+            "storage": {
+                "t": {
+                    "": {
+                        "1ef0-a": {"id": "1ef0-a", "channel_values": {"messages": messages_to_dict(older)}},
+                        "1ef0-b": {"id": "1ef0-b", "channel_values": {"messages": messages_to_dict(newer)}},
+                    }
+                }
+            }
+        },
+    )
+
+    with caplog.at_level(logging.WARNING):
+        messages = row.messages()
+
+    assert row.is_snapshot
+    assert messages_from_dict(messages) == newer
+    assert "full snapshot" in caplog.text
+    assert UserThread(user_id="u", thread_id="t", checkpoint=None).messages() == []